@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import scorecard_api
+from scorecard_engine import CAMPAIGN_TYPES, SCORE_OPTIONS, score_scorecard, select_metrics
+
+
+def random_scorecard(rng):
+    campaign_type = rng.choice(CAMPAIGN_TYPES)
+    pre_metrics, post_metrics = select_metrics(campaign_type)
+    return {
+        "campaign": {"Campaign Type": campaign_type, "Campaign Name": f"Campaign {rng.randrange(10 ** 6)}"},
+        "pre_metrics": pre_metrics,
+        "post_metrics": post_metrics,
+        "pre_scores": {f"pre_{cat}_{metric}": rng.choice(list(SCORE_OPTIONS))
+                       for cat, metrics in pre_metrics.items() for metric in metrics},
+        "post_scores": {f"post_{cat}_{metric}": rng.choice(list(SCORE_OPTIONS))
+                        for cat, metrics in post_metrics.items() for metric in metrics},
+    }
+
+
+def report(label, count, elapsed):
+    print(f"{label:<32} {count:>6} scorecards in {elapsed:7.3f}s  ({count / elapsed:10.1f}/s)")
+
+
+def bench_engine(scorecards):
+    start = time.perf_counter()
+    for scorecard in scorecards:
+        score_scorecard(scorecard)
+    report("engine (uncached)", len(scorecards), time.perf_counter() - start)
+
+    scorecard_api._score_cache.clear()
+    start = time.perf_counter()
+    for scorecard in scorecards:
+        scorecard_api.cached_score(scorecard)
+    report("engine (cold cache)", len(scorecards), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for scorecard in scorecards:
+        scorecard_api.cached_score(scorecard)
+    report("engine (warm cache)", len(scorecards), time.perf_counter() - start)
+
+
+async def bench_http(scorecards, batch_size):
+    scorecard_api._score_cache.clear()
+    async with TestClient(TestServer(scorecard_api.create_app())) as client:
+        for label in ("http /score/batch (cold cache)", "http /score/batch (warm cache)"):
+            start = time.perf_counter()
+            for i in range(0, len(scorecards), batch_size):
+                response = await client.post("/score/batch", json={"scorecards": scorecards[i:i + batch_size]})
+                assert response.status == 200, await response.text()
+                await response.json()
+            report(label, len(scorecards), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/score", json=scorecard) for scorecard in scorecards))
+        for response in responses:
+            assert response.status == 200, await response.text()
+            await response.json()
+        report("http /score (concurrent, warm)", len(scorecards), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure scoring API throughput")
+    parser.add_argument("--count", type=int, default=2000, help="Number of distinct scorecards")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scorecards = [random_scorecard(rng) for _ in range(args.count)]
+    bench_engine(scorecards)
+    asyncio.run(bench_http(scorecards, args.batch_size))
@@ -0,0 +1,219 @@
+import io
+import multiprocessing
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from report_pipeline import cached_report, render_report, report_cache_key, store_report
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs that are never collected are dropped after this many seconds
+JOB_TTL_SECONDS = 60 * 60
+
+
+def _build_report(scorecard, fmt):
+    """Worker entry point: render one report in a pool process and return (file name, bytes)."""
+    return render_report(scorecard, fmt)
+
+
+class ReportJobQueue:
+    """Background report generation backed by a process pool.
+
+    Jobs are submitted individually or as a batch and tracked by id, so the UI
+    can poll ``batch_progress`` and pick up finished artifacts on a later rerun
+    instead of rendering inside the button handler. Finished artifacts are kept
+    in the parent process's render cache, so repeat requests skip the pool.
+    """
+
+    def __init__(self, max_workers=None, job_ttl=JOB_TTL_SECONDS):
+        self._max_workers = max_workers
+        self._executor = self._new_executor()
+        self._job_ttl = job_ttl
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._futures = {}
+        self._batches = {}
+        self._archives = {}
+
+    def _new_executor(self):
+        # Spawn workers rather than forking the multi-threaded Streamlit server
+        return ProcessPoolExecutor(max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_broken_executor(self, broken):
+        """Swap in a fresh pool after a worker died; the old one can never run jobs again."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, scorecard, fmt, batch_id=None):
+        """Queue a single report job and return its job id."""
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'batch_id': batch_id,
+            'format': fmt,
+            'campaign_name': scorecard.get("campaign", {}).get("Campaign Name", ""),
+            'status': PENDING,
+            'submitted_at': datetime.now(),
+            'file_name': None,
+            'data': None,
+            'error': None,
+            'finished_at': None,
+            'cache_key': report_cache_key(scorecard, fmt),
+        }
+        cached = cached_report(job['cache_key'])
+        if cached is not None:
+            job['file_name'], job['data'] = cached
+            job['status'] = DONE
+            job['finished_at'] = time.monotonic()
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = job
+            if batch_id is not None:
+                self._batches.setdefault(batch_id, []).append(job_id)
+        if cached is not None:
+            return job_id
+        executor = self._executor
+        try:
+            future = executor.submit(_build_report, scorecard, fmt)
+        except BrokenProcessPool as e:
+            self._replace_broken_executor(executor)
+            self._finish(job_id, error=f"Report worker crashed, please retry ({e})")
+            return job_id
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f, executor))
+        return job_id
+
+    def submit_batch(self, scorecards, fmt):
+        """Queue one job per scorecard under a shared batch id and return the batch id."""
+        batch_id = uuid.uuid4().hex
+        for scorecard in scorecards:
+            self.submit(scorecard, fmt, batch_id=batch_id)
+        return batch_id
+
+    def _on_done(self, job_id, future, executor):
+        try:
+            file_name, data = future.result()
+        except BrokenProcessPool as e:
+            self._replace_broken_executor(executor)
+            self._finish(job_id, error=f"Report worker crashed, please retry ({e})")
+        except Exception as e:
+            self._finish(job_id, error=str(e))
+        else:
+            self._finish(job_id, file_name=file_name, data=data)
+
+    def _finish(self, job_id, file_name=None, data=None, error=None):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['finished_at'] = time.monotonic()
+            if error is not None:
+                job['error'] = error
+                job['status'] = FAILED
+                return
+            job['file_name'], job['data'] = file_name, data
+            job['status'] = DONE
+        store_report(job['cache_key'], file_name, data)
+
+    def _expire(self):
+        # Caller holds self._lock
+        cutoff = time.monotonic() - self._job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['status'] in (DONE, FAILED) and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired:
+            self._prune_batches()
+
+    def _prune_batches(self):
+        for batch_id, members in list(self._batches.items()):
+            self._batches[batch_id] = [job_id for job_id in members if job_id in self._jobs]
+            if not self._batches[batch_id]:
+                del self._batches[batch_id]
+                self._archives.pop(batch_id, None)
+
+    def _snapshot(self, job_id):
+        job = dict(self._jobs[job_id])
+        future = self._futures.get(job_id)
+        if job['status'] == PENDING and future is not None and future.running():
+            job['status'] = RUNNING
+        return job
+
+    def job(self, job_id):
+        """Snapshot of a job's state, or None if the id is unknown."""
+        with self._lock:
+            self._expire()
+            return self._snapshot(job_id) if job_id in self._jobs else None
+
+    def batch_jobs(self, batch_id):
+        with self._lock:
+            self._expire()
+            return [self._snapshot(job_id) for job_id in self._batches.get(batch_id, [])]
+
+    def is_finished(self, kind, job_id):
+        """Whether a tracked job ('job') or batch ('batch') has nothing left to run."""
+        if kind == 'job':
+            job = self.job(job_id)
+            return job is None or job['status'] in (DONE, FAILED)
+        return self.batch_progress(job_id) == 1 or not self.batch_jobs(job_id)
+
+    def batch_progress(self, batch_id):
+        """Fraction of a batch's jobs that have finished (successfully or not)."""
+        jobs = self.batch_jobs(batch_id)
+        if not jobs:
+            return 0.0
+        return sum(job['status'] in (DONE, FAILED) for job in jobs) / len(jobs)
+
+    def batch_archive(self, batch_id):
+        """Zip all finished reports of a batch into a single download.
+
+        The archive of a completed batch is built once and then reused, so
+        polling the UI does not re-zip large batches.
+        """
+        with self._lock:
+            if batch_id in self._archives:
+                return self._archives[batch_id]
+        jobs = self.batch_jobs(batch_id)
+        complete = bool(jobs) and all(job['status'] in (DONE, FAILED) for job in jobs)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            seen = set()
+            for index, job in enumerate(jobs, start=1):
+                if job['status'] != DONE:
+                    continue
+                file_name = job['file_name']
+                if file_name in seen:
+                    file_name = f"{index:03d}_{file_name}"
+                seen.add(file_name)
+                archive.writestr(file_name, job['data'])
+        data = buffer.getvalue()
+        if complete:
+            with self._lock:
+                if batch_id in self._batches:
+                    self._archives[batch_id] = data
+        return data
+
+    def discard(self, job_ids):
+        """Drop finished jobs once their results have been collected."""
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is not None and job['status'] in (DONE, FAILED):
+                    del self._jobs[job_id]
+            self._prune_batches()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
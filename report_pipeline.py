@@ -0,0 +1,336 @@
+import base64
+import io
+import textwrap
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from html import escape
+
+import numpy as np
+import pandas as pd
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import Font, PatternFill
+
+from scorecard_engine import phase_percentage, scorecard_hash
+
+import matplotlib
+matplotlib.use("Agg")  # Render charts off-screen, no display needed
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+PRIMARY_COLOR = "#0066ff"
+SECONDARY_COLOR = "#003399"
+HEADER_FILL = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
+
+REPORT_FORMATS = {
+    "excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "html": ("html", "text/html"),
+    "pdf": ("pdf", "application/pdf"),
+}
+
+# Rendered (file name, artifact) pairs keyed by (content hash, format); oldest entries are evicted first
+RENDER_CACHE_SIZE = 64
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def build_report_model(scorecard, generated_at=None):
+    """Build the format-independent report model from a raw scorecard.
+
+    The scorecard is a plain dict with the keys ``campaign`` (field name -> value),
+    ``pre_metrics``/``post_metrics`` (category -> list of metrics),
+    ``pre_scores``/``post_scores`` (``"{phase}_{category}_{metric}"`` -> score)
+    and ``comments`` (same keys -> comment text).
+    """
+    sections = []
+    for phase, title in (("pre", "Pre-Campaign Scorecard"), ("post", "Post-Campaign Scorecard")):
+        metrics_dict = scorecard.get(f"{phase}_metrics", {})
+        scores = scorecard.get(f"{phase}_scores", {})
+        comments = scorecard.get("comments", {})
+        rows = []
+        category_averages = []
+        for category, metrics in metrics_dict.items():
+            category_scores = []
+            for metric in metrics:
+                key = f"{phase}_{category}_{metric}"
+                score = scores.get(key, 0)
+                category_scores.append(score)
+                rows.append({
+                    'Category': category,
+                    'Metric': metric,
+                    'Score': score,
+                    'Comments': comments.get(key, ""),
+                })
+            category_averages.append({
+                'Category': category,
+                'Average Score': float(np.mean(category_scores)) if category_scores else 0.0,
+            })
+        sections.append({
+            'phase': phase,
+            'title': title,
+            'rows': rows,
+            'category_averages': category_averages,
+            'percentage': phase_percentage(scores, metrics_dict, phase),
+        })
+
+    return {
+        'hash': scorecard_hash(scorecard),
+        'campaign': dict(scorecard.get("campaign", {})),
+        'sections': sections,
+        'generated_at': (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def render_category_chart(model):
+    """Render the pre/post category averages as a grouped bar chart, returned as PNG bytes."""
+    categories = []
+    for section in model['sections']:
+        for row in section['category_averages']:
+            if row['Category'] not in categories:
+                categories.append(row['Category'])
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    width = 0.4
+    x = np.arange(len(categories))
+    for offset, section, color in ((-width / 2, model['sections'][0], PRIMARY_COLOR),
+                                   (width / 2, model['sections'][1], SECONDARY_COLOR)):
+        averages = {row['Category']: row['Average Score'] for row in section['category_averages']}
+        ax.bar(x + offset, [averages.get(cat, 0) for cat in categories], width,
+               label=section['title'].replace(" Scorecard", ""), color=color)
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories, rotation=30, ha='right')
+    ax.set_ylim(0, 5)
+    ax.set_ylabel('Average Score')
+    ax.set_title('Category Performance Comparison', color=PRIMARY_COLOR)
+    ax.legend()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=150)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_excel(model):
+    """Render the report model as an Excel workbook with a summary sheet and one sheet per phase."""
+    summary = [["Campaign Information", ""]]
+    summary += [[field, value] for field, value in model['campaign'].items()]
+    summary.append(["", ""])
+    summary.append(["Score Summary", ""])
+    summary += [[section['title'].replace("Scorecard", "Score"), f"{section['percentage']:.1f}%"]
+                for section in model['sections']]
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        pd.DataFrame(summary).to_excel(writer, sheet_name='Summary', index=False, header=False)
+        summary_sheet = writer.sheets['Summary']
+        for row in summary_sheet.iter_rows(min_col=1, max_col=2):
+            if row[0].value in ("Campaign Information", "Score Summary"):
+                for cell in row:
+                    cell.font = Font(bold=True)
+                    cell.fill = HEADER_FILL
+        summary_sheet.column_dimensions['A'].width = 28
+        summary_sheet.column_dimensions['B'].width = 40
+        chart = XLImage(io.BytesIO(render_category_chart(model)))
+        chart.width, chart.height = 750, 375
+        summary_sheet.add_image(chart, 'D2')
+
+        for section in model['sections']:
+            sheet_name = section['title'].replace(" Scorecard", "")
+            df = pd.DataFrame(section['rows'], columns=['Category', 'Metric', 'Score', 'Comments'])
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            worksheet = writer.sheets[sheet_name]
+            for cell in worksheet['1:1']:
+                cell.font = Font(bold=True)
+                cell.fill = HEADER_FILL
+            for column, width in zip('ABCD', (26, 38, 8, 50)):
+                worksheet.column_dimensions[column].width = width
+    return buffer.getvalue()
+
+
+def render_html(model):
+    """Render the report model as a self-contained HTML page with the chart embedded inline."""
+    chart = base64.b64encode(render_category_chart(model)).decode("ascii")
+    campaign_rows = "".join(
+        f"<tr><th>{escape(str(field))}</th><td>{escape(str(value))}</td></tr>"
+        for field, value in model['campaign'].items()
+    )
+    summary_rows = "".join(
+        f"<tr><th>{escape(section['title'].replace('Scorecard', 'Score'))}</th>"
+        f"<td>{section['percentage']:.1f}%</td></tr>"
+        for section in model['sections']
+    )
+    section_tables = ""
+    for section in model['sections']:
+        rows = "".join(
+            f"<tr><td>{escape(row['Category'])}</td><td>{escape(row['Metric'])}</td>"
+            f"<td>{row['Score']}</td><td>{escape(str(row['Comments']))}</td></tr>"
+            for row in section['rows']
+        )
+        section_tables += (
+            f"<h2>{escape(section['title'])}</h2>"
+            "<table><tr><th>Category</th><th>Metric</th><th>Score</th><th>Comments</th></tr>"
+            f"{rows}</table>"
+        )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{escape(str(model['campaign'].get('Campaign Name', '')))} Scorecard</title>
+<style>
+    body {{ font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif; margin: 32px; color: #333333; }}
+    h1 {{ color: white; background: linear-gradient(135deg, #0066FF 0%, #0052cc 100%); padding: 20px; border-radius: 12px; text-align: center; }}
+    h2 {{ color: #0052cc; border-bottom: 3px solid #0066FF; padding-bottom: 8px; }}
+    table {{ border-collapse: collapse; width: 100%; margin-bottom: 24px; }}
+    th, td {{ border: 1px solid #dee2e6; padding: 8px; text-align: left; }}
+    th {{ background-color: #e6f0ff; }}
+    img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>Campaign Scorecard</h1>
+<h2>Campaign Information</h2>
+<table>{campaign_rows}</table>
+<h2>Score Summary</h2>
+<table>{summary_rows}</table>
+<img src="data:image/png;base64,{chart}" alt="Category Performance Comparison">
+{section_tables}
+<p><small>Generated {escape(model['generated_at'])}</small></p>
+</body>
+</html>
+"""
+
+
+# PDF table layout, in axes fractions of an A4 page; comments are wrapped rather than cut off
+PDF_LINE_HEIGHT = 0.018
+PDF_ROW_PADDING = 0.01
+PDF_PAGE_HEIGHT = 0.95
+PDF_WRAP_WIDTHS = (20, 34, 6, 27)  # Characters per line for Category, Metric, Score, Comments
+
+
+def _wrap_pdf_row(row):
+    """Wrap a table row's cells to the PDF column widths; returns (cells, line count)."""
+    cells = []
+    for value, width in zip((row['Category'], row['Metric'], row['Score'], row['Comments']), PDF_WRAP_WIDTHS):
+        lines = [line for paragraph in str(value).splitlines() or [""]
+                 for line in textwrap.wrap(paragraph, width) or [""]]
+        cells.append("\n".join(lines))
+    return cells, max(cell.count("\n") + 1 for cell in cells)
+
+
+def _paginate_rows(wrapped_rows):
+    """Split wrapped rows into pages that fit below the header row."""
+    pages = []
+    page, used = [], PDF_LINE_HEIGHT + PDF_ROW_PADDING
+    for cells, lines in wrapped_rows:
+        height = PDF_LINE_HEIGHT * lines + PDF_ROW_PADDING
+        if page and used + height > PDF_PAGE_HEIGHT:
+            pages.append(page)
+            page, used = [], PDF_LINE_HEIGHT + PDF_ROW_PADDING
+        page.append((cells, lines))
+        used += height
+    if page:
+        pages.append(page)
+    return pages
+
+
+def render_pdf(model):
+    """Render the report model as a multi-page PDF: summary page with chart, then table pages per phase."""
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        fig = plt.figure(figsize=(8.27, 11.69))  # A4 portrait
+        fig.text(0.5, 0.95, "Campaign Scorecard", ha='center', fontsize=20, color=PRIMARY_COLOR, weight='bold')
+        y = 0.9
+        for field, value in model['campaign'].items():
+            fig.text(0.08, y, f"{field}:", fontsize=11, weight='bold')
+            fig.text(0.35, y, str(value), fontsize=11)
+            y -= 0.025
+        y -= 0.02
+        for section in model['sections']:
+            fig.text(0.08, y, f"{section['title'].replace('Scorecard', 'Score')}:", fontsize=12, weight='bold')
+            fig.text(0.35, y, f"{section['percentage']:.1f}%", fontsize=12, color=PRIMARY_COLOR)
+            y -= 0.03
+        chart_ax = fig.add_axes([0.05, 0.08, 0.9, y - 0.12])
+        chart_ax.imshow(plt.imread(io.BytesIO(render_category_chart(model)), format='png'))
+        chart_ax.axis('off')
+        pdf.savefig(fig)
+        plt.close(fig)
+
+        for section in model['sections']:
+            pages = _paginate_rows([_wrap_pdf_row(row) for row in section['rows']]) or [[]]
+            for page_number, page_rows in enumerate(pages, start=1):
+                fig, ax = plt.subplots(figsize=(8.27, 11.69))
+                ax.axis('off')
+                title = section['title'] if page_number == 1 else f"{section['title']} (continued)"
+                ax.set_title(title, color=PRIMARY_COLOR, fontsize=16, loc='left')
+                if page_rows:
+                    table = ax.table(cellText=[cells for cells, _ in page_rows],
+                                     colLabels=['Category', 'Metric', 'Score', 'Comments'],
+                                     colWidths=[0.22, 0.38, 0.08, 0.32], loc='upper center', cellLoc='left')
+                    table.auto_set_font_size(False)
+                    table.set_fontsize(8)
+                    row_lines = [1] + [lines for _, lines in page_rows]
+                    for (row, _), cell in table.get_celld().items():
+                        cell.set_height(PDF_LINE_HEIGHT * row_lines[row] + PDF_ROW_PADDING)
+                        if row == 0:
+                            cell.set_text_props(weight='bold')
+                            cell.set_facecolor('#CCCCCC')
+                pdf.savefig(fig)
+                plt.close(fig)
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "excel": render_excel,
+    "html": render_html,
+    "pdf": render_pdf,
+}
+
+
+def report_cache_key(scorecard, fmt):
+    return scorecard_hash(scorecard), fmt
+
+
+def cached_report(cache_key):
+    """Cached (file name, artifact) for a render cache key, or None."""
+    with _render_cache_lock:
+        if cache_key not in _render_cache:
+            return None
+        _render_cache.move_to_end(cache_key)
+        return _render_cache[cache_key]
+
+
+def store_report(cache_key, file_name, artifact):
+    with _render_cache_lock:
+        _render_cache[cache_key] = (file_name, artifact)
+        if len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+
+
+def render_report(scorecard, fmt):
+    """Render a scorecard in the given format and return (file name, artifact).
+
+    Unchanged content is served from the render cache; a cached report keeps
+    the file name and "Generated" timestamp of its first render.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    cache_key = report_cache_key(scorecard, fmt)
+    cached = cached_report(cache_key)
+    if cached is not None:
+        return cached
+
+    generated_at = datetime.now()
+    file_name = report_filename(scorecard, fmt, generated_at)
+    artifact = RENDERERS[fmt](build_report_model(scorecard, generated_at))
+    store_report(cache_key, file_name, artifact)
+    return file_name, artifact
+
+
+def report_filename(scorecard, fmt, generated_at=None):
+    """File name for a rendered report, e.g. ``tiktok_campaign_scorecard_20240101_120000.pdf``."""
+    extension, _ = REPORT_FORMATS[fmt]
+    campaign_type = str(scorecard.get("campaign", {}).get("Campaign Type", "campaign"))
+    timestamp = (generated_at or datetime.now()).strftime('%Y%m%d_%H%M%S')
+    return f"{campaign_type.lower().replace(' ', '_')}_scorecard_{timestamp}.{extension}"
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import threading
+from collections import OrderedDict
+
+from aiohttp import web
+
+from scorecard_engine import (
+    CAMPAIGN_TYPES, METRIC_DEFINITIONS, POST_METRICS_BASE, PRE_METRICS_BASE, RECOMMENDATIONS,
+    SCORE_OPTIONS, score_scorecard, scorecard_hash
+)
+
+MAX_BATCH_SIZE = 1000
+BATCH_CHUNK_SIZE = 50   # Scorecards scored per executor call in a batch
+
+# Scored results keyed by scorecard content hash; oldest entries are evicted first
+SCORE_CACHE_SIZE = 4096
+_score_cache = OrderedDict()
+_score_cache_lock = threading.Lock()
+
+
+def cached_score(scorecard):
+    """Score a scorecard, reusing the result for identical input."""
+    key = scorecard_hash(scorecard)
+    with _score_cache_lock:
+        if key in _score_cache:
+            _score_cache.move_to_end(key)
+            return _score_cache[key]
+    result = score_scorecard(scorecard)
+    with _score_cache_lock:
+        _score_cache[key] = result
+        if len(_score_cache) > SCORE_CACHE_SIZE:
+            _score_cache.popitem(last=False)
+    return result
+
+
+def _score_chunk(scorecards):
+    results = []
+    for scorecard in scorecards:
+        try:
+            results.append({'ok': True, 'result': cached_score(scorecard)})
+        except (ValueError, TypeError, AttributeError) as e:
+            results.append({'ok': False, 'error': str(e)})
+    return results
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body must be valid JSON")
+
+
+async def health(request):
+    return web.json_response({'status': 'ok'})
+
+
+async def metrics(request):
+    return web.json_response({
+        'campaign_types': CAMPAIGN_TYPES,
+        'pre_metrics': PRE_METRICS_BASE,
+        'post_metrics': POST_METRICS_BASE,
+        'definitions': METRIC_DEFINITIONS,
+        'recommendations': RECOMMENDATIONS,
+        'score_options': {str(score): label for score, label in SCORE_OPTIONS.items()},
+    })
+
+
+async def score(request):
+    scorecard = await _read_json(request)
+    if not isinstance(scorecard, dict):
+        raise web.HTTPBadRequest(text="Expected a scorecard object")
+    result = _score_chunk([scorecard])[0]
+    if not result['ok']:
+        raise web.HTTPBadRequest(text=result['error'])
+    return web.json_response(result['result'])
+
+
+async def score_batch(request):
+    payload = await _read_json(request)
+    scorecards = payload.get("scorecards") if isinstance(payload, dict) else payload
+    if not isinstance(scorecards, list) or not all(isinstance(s, dict) for s in scorecards):
+        raise web.HTTPBadRequest(text="Expected a list of scorecard objects")
+    if len(scorecards) > MAX_BATCH_SIZE:
+        raise web.HTTPBadRequest(text=f"At most {MAX_BATCH_SIZE} scorecards per batch")
+
+    # Score in chunks on the default thread pool so large batches don't block other requests
+    loop = asyncio.get_running_loop()
+    chunks = [scorecards[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(scorecards), BATCH_CHUNK_SIZE)]
+    chunk_results = await asyncio.gather(*(loop.run_in_executor(None, _score_chunk, chunk) for chunk in chunks))
+    return web.json_response({'results': [result for chunk in chunk_results for result in chunk]})
+
+
+def create_app():
+    app = web.Application(client_max_size=16 * 1024 ** 2)
+    app.add_routes([
+        web.get('/health', health),
+        web.get('/metrics', metrics),
+        web.post('/score', score),
+        web.post('/score/batch', score_batch),
+    ])
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scorecard scoring API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -0,0 +1,267 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+CAMPAIGN_TYPES = ["TikTok Campaign", "DIVE Campaign", "BYOB"]
+
+METRIC_DEFINITIONS = {
+    # Common Pre-Campaign Metrics (All Campaigns)
+    'Assets received on time': 'Measures if all creative assets were delivered by the scheduled date.',
+    'Storyboard approvals met deadlines': 'Checks if storyboard approvals were completed on time.',
+    'Creative meets format & resolution': 'Ensures creative assets meet required formats and resolution standards.',
+    'Workback schedule followed': 'Verifies if the production timeline was adhered to as planned.',
+    'Vendor deadlines met': 'Confirms if external vendors met their deadlines.',
+    'Final creative delivered on time': 'Ensures the final creative was delivered by the deadline.',
+    'Billboard locations confirmed': 'Verifies that billboard placements were secured and confirmed.',
+    'Vendor tests & pre-launch checks done': 'Confirms all pre-launch tests and checks by vendors were completed.',
+    'Client Approvals Responsiveness': 'Evaluates client responsiveness during approval processes.',
+    # Strategy Category (All Campaigns)
+    'QR Code Added': 'Checks if a QR code was included in the campaign materials.',
+    'Clear CTA': 'Ensures the campaign includes a clear Call-to-Action.',
+    'Hashtag': 'Confirms a campaign-specific hashtag was created and implemented.',
+    # TikTok-Only Pre-Campaign Metrics
+    'TikTok Platform Compliance': 'Ensures content meets TikTok’s platform-specific rules.',
+    'TikTok Ad Moderation Passed': 'Confirms TikTok ads passed moderation checks.',
+    'TikTok Branded Mission': 'Verifies alignment with TikTok’s branded mission feature.',
+    'TikTok Branded Effects': 'Confirms branded effects were implemented on TikTok.',
+    'Creators Approval / responsiveness': 'Assesses responsiveness of creators during approvals.',
+    'Creators UGC Approvals': 'Confirms approval of user-generated content from creators.',
+    # Common Post-Campaign Metrics (All Campaigns)
+    'High-quality images captured': 'Ensures campaign visuals meet quality standards.',
+    'Splash video created': 'Confirms a promotional video was produced.',
+    'Social media features': 'Tracks use of social media features like stories or reels.',
+    'Key wins identified': 'Highlights successful aspects of the campaign.',
+    'Areas for improvement noted': 'Identifies aspects needing enhancement.',
+}
+
+# Recommendations for automated insights
+RECOMMENDATIONS = {
+    'Assets received on time': 'Set earlier internal deadlines or improve coordination with asset providers.',
+    'Storyboard approvals met deadlines': 'Streamline the approval process with clearer timelines.',
+    'Creative meets format & resolution': 'Review asset specifications with the creative team before submission.',
+    'Workback schedule followed': 'Enhance timeline visibility with project management tools.',
+    'Vendor deadlines met': 'Increase vendor oversight or negotiate stricter deadlines.',
+    'Final creative delivered on time': 'Implement buffer periods or escalate delays earlier.',
+    'Billboard locations confirmed': 'Confirm locations earlier in the planning phase.',
+    'Vendor tests & pre-launch checks done': 'Schedule pre-launch checks earlier to catch issues.',
+    'Client Approvals Responsiveness': 'Schedule regular check-ins to expedite client feedback.',
+    'QR Code Added': 'Ensure QR code inclusion is part of the initial creative brief.',
+    'Clear CTA': 'Test CTAs with a focus group to ensure clarity.',
+    'Hashtag': 'Promote hashtag usage earlier in the campaign.',
+    'TikTok Platform Compliance': 'Train team on TikTok guidelines or consult platform experts.',
+    'TikTok Ad Moderation Passed': 'Submit ads earlier to allow time for revisions.',
+    'TikTok Branded Mission': 'Align mission with TikTok trends for better traction.',
+    'TikTok Branded Effects': 'Test effects with a small audience before full rollout.',
+    'Creators Approval / responsiveness': 'Set clear response deadlines for creators.',
+    'Creators UGC Approvals': 'Simplify UGC approval process with predefined criteria.',
+    'High-quality images captured': 'Invest in better equipment or training for photography team.',
+    'Splash video created': 'Plan video production earlier to ensure quality.',
+    'Social media features': 'Experiment with additional features like polls or live streams.',
+    'Key wins identified': 'Document wins in real-time during the campaign.',
+    'Areas for improvement noted': 'Conduct a post-mortem meeting to identify gaps.'
+}
+
+SCORE_OPTIONS = {
+    0: "0 - No/Poor",
+    3: "3 - Partial/Medium",
+    5: "5 - Yes/Excellent"
+}
+
+
+# Base metrics per category, filtered per campaign type
+PRE_METRICS_BASE = {
+    'Creative Readiness': [
+        'Assets received on time',
+        'Storyboard approvals met deadlines',
+        'Creative meets format & resolution'
+    ],
+    'Production Timeline': [
+        'Workback schedule followed',
+        'Vendor deadlines met',
+        'Final creative delivered on time'
+    ],
+    'Placement & Inventory': [
+        'Billboard locations confirmed'
+    ],
+    'Approval & Compliance': [
+        'Vendor tests & pre-launch checks done',
+        'Client Approvals Responsiveness'
+    ],
+    'Strategy': [
+        'QR Code Added',
+        'Clear CTA',
+        'Hashtag'
+    ],
+    'TikTok Specific': [
+        'TikTok Platform Compliance',
+        'TikTok Ad Moderation Passed',
+        'TikTok Branded Mission',
+        'TikTok Branded Effects',
+        'Creators Approval / responsiveness',
+        'Creators UGC Approvals'
+    ]
+}
+POST_METRICS_BASE = {
+    'Photography & Visibility': [
+        'High-quality images captured',
+        'Splash video created',
+        'Social media features'
+    ],
+    'Campaign Learnings': [
+        'Key wins identified',
+        'Areas for improvement noted'
+    ]
+}
+
+
+def scorecard_hash(scorecard):
+    """Stable content hash of a scorecard payload (campaign info, metrics, scores, comments)."""
+    payload = json.dumps(scorecard, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def available_pre_categories(campaign_type):
+    """Pre-campaign categories that apply to a campaign type (TikTok Specific only for TikTok)."""
+    return [cat for cat in PRE_METRICS_BASE.keys() if cat != 'TikTok Specific' or campaign_type == "TikTok Campaign"]
+
+
+def select_metrics(campaign_type, pre_categories=None, post_categories=None):
+    """Metrics to score for a campaign type, limited to the selected categories (all by default)."""
+    if campaign_type not in CAMPAIGN_TYPES:
+        raise ValueError(f"Unknown campaign type: {campaign_type}")
+    all_pre_categories = available_pre_categories(campaign_type)
+    if pre_categories is None:
+        pre_categories = all_pre_categories
+    if post_categories is None:
+        post_categories = list(POST_METRICS_BASE.keys())
+    pre_metrics = {cat: metrics for cat, metrics in PRE_METRICS_BASE.items()
+                   if cat in pre_categories and cat in all_pre_categories}
+    post_metrics = {cat: POST_METRICS_BASE[cat] for cat in post_categories if cat in POST_METRICS_BASE}
+    return pre_metrics, post_metrics
+
+
+def phase_percentage(scores_dict, metrics_dict, phase):
+    """Total score of a phase as a percentage of the maximum (5 per metric)."""
+    keys = [f"{phase}_{category}_{metric}" for category, metrics in metrics_dict.items() for metric in metrics]
+    score_max = len(keys) * 5
+    score_total = sum(scores_dict.get(key, 0) for key in keys)
+    return (score_total / score_max * 100) if score_max > 0 else 0
+
+
+def create_category_df(scores_dict, metrics_dict, phase):
+    data = []
+    for category, metrics in metrics_dict.items():
+        category_scores = [scores_dict.get(f"{phase}_{category}_{metric}", 0) for metric in metrics]
+        avg_score = np.mean(category_scores) if category_scores else 0
+        data.append({
+            'Category': category,
+            'Average Score': avg_score,
+            'Phase': 'Pre-Campaign' if phase == 'pre' else 'Post-Campaign'
+        })
+    return pd.DataFrame(data)
+
+
+def compare_categories(pre_df, post_df):
+    """Per-category change from pre to post campaign, split into improvements and declines (in %)."""
+    improvements = []
+    declines = []
+    if pre_df.empty or post_df.empty:
+        return improvements, declines
+    common_categories = set(pre_df['Category']).intersection(set(post_df['Category']))
+
+    for category in common_categories:
+        try:
+            pre_score = pre_df[pre_df['Category'] == category]['Average Score'].iloc[0] if not pre_df[pre_df['Category'] == category].empty else 0
+            post_score = post_df[post_df['Category'] == category]['Average Score'].iloc[0] if not post_df[post_df['Category'] == category].empty else 0
+            pre_percent = (pre_score / 5) * 100 if pre_score > 0 else 0
+            post_percent = (post_score / 5) * 100 if post_score > 0 else 0
+            if pre_percent == 0 and post_percent == 0:
+                continue
+            elif pre_percent == 0 and post_percent > 0:
+                improvements.append((category, post_percent))
+            else:
+                diff = post_percent - pre_percent
+                if diff > 0:
+                    improvements.append((category, diff))
+                elif diff < 0:
+                    declines.append((category, abs(diff)))
+        except (IndexError, KeyError):
+            continue
+    return improvements, declines
+
+
+def areas_for_focus(pre_scores, post_scores, limit=3):
+    """Lowest-scoring metrics (below 3) with their recommendation, lowest first."""
+    low_scores = [(key.split('_')[-1], score) for key, score in {**pre_scores, **post_scores}.items() if score < 3]
+    low_scores.sort(key=lambda x: x[1])  # Sort by score (lowest first)
+    return [(metric, score, RECOMMENDATIONS.get(metric, 'Review process for improvement.'))
+            for metric, score in low_scores[:limit]]
+
+
+def validate_metrics(metrics_dict, phase, campaign_type):
+    """Reject categories or metrics that are not in the catalog for this phase and campaign type."""
+    if phase == 'pre':
+        allowed = {cat: PRE_METRICS_BASE[cat] for cat in available_pre_categories(campaign_type)}
+    else:
+        allowed = POST_METRICS_BASE
+    if not isinstance(metrics_dict, dict):
+        raise ValueError(f"{phase}_metrics must map categories to lists of metrics")
+    for category, metrics in metrics_dict.items():
+        if category not in allowed:
+            raise ValueError(f"Unknown {phase}-campaign category for {campaign_type}: {category!r}")
+        if not isinstance(metrics, list):
+            raise ValueError(f"Metrics for {category!r} must be a list")
+        for metric in metrics:
+            if metric not in allowed[category]:
+                raise ValueError(f"Unknown metric in {category!r}: {metric!r}")
+
+
+def score_scorecard(scorecard):
+    """Score a scorecard payload outside the UI.
+
+    Takes the same dict the app exports (``campaign``, ``pre_scores``,
+    ``post_scores`` and optionally ``pre_metrics``/``post_metrics``; when the
+    metrics are omitted or null every category for the campaign type is
+    scored, while an empty mapping scores no categories for that phase) and
+    returns JSON-serializable percentages, category averages, category
+    changes and recommendations.
+    """
+    campaign_type = scorecard.get("campaign", {}).get("Campaign Type", "DIVE Campaign")
+    default_pre, default_post = select_metrics(campaign_type)
+    # An explicit {} means every category was deselected, as in the app; only a missing key means "all"
+    pre_metrics = scorecard.get("pre_metrics")
+    post_metrics = scorecard.get("post_metrics")
+    pre_metrics = default_pre if pre_metrics is None else pre_metrics
+    post_metrics = default_post if post_metrics is None else post_metrics
+    validate_metrics(pre_metrics, 'pre', campaign_type)
+    validate_metrics(post_metrics, 'post', campaign_type)
+    # Only scores of the selected metrics count, as in the app after its session state cleanup
+    pre_keys = {f"pre_{cat}_{metric}" for cat, metrics in pre_metrics.items() for metric in metrics}
+    post_keys = {f"post_{cat}_{metric}" for cat, metrics in post_metrics.items() for metric in metrics}
+    pre_scores = {k: v for k, v in scorecard.get("pre_scores", {}).items() if k in pre_keys}
+    post_scores = {k: v for k, v in scorecard.get("post_scores", {}).items() if k in post_keys}
+    for key, score in {**pre_scores, **post_scores}.items():
+        if score not in SCORE_OPTIONS:
+            raise ValueError(f"Invalid score {score!r} for {key}; expected one of {list(SCORE_OPTIONS)}")
+
+    pre_df = create_category_df(pre_scores, pre_metrics, 'pre')
+    post_df = create_category_df(post_scores, post_metrics, 'post')
+    improvements, declines = compare_categories(pre_df, post_df)
+    improvements.sort(key=lambda x: x[1], reverse=True)
+    declines.sort(key=lambda x: x[1], reverse=True)
+    return {
+        'pre_percentage': phase_percentage(pre_scores, pre_metrics, 'pre'),
+        'post_percentage': phase_percentage(post_scores, post_metrics, 'post'),
+        'category_averages': {
+            'pre': {row['Category']: float(row['Average Score']) for _, row in pre_df.iterrows()},
+            'post': {row['Category']: float(row['Average Score']) for _, row in post_df.iterrows()},
+        },
+        'improvements': [{'category': category, 'change': float(diff)} for category, diff in improvements],
+        'declines': [{'category': category, 'change': float(diff)} for category, diff in declines],
+        'recommendations': [
+            {'metric': metric, 'score': score, 'label': SCORE_OPTIONS[score], 'recommendation': recommendation}
+            for metric, score, recommendation in areas_for_focus(pre_scores, post_scores)
+        ],
+    }
@@ -0,0 +1,222 @@
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from scorecard_engine import scorecard_hash
+
+HISTORY_FILE = "scorecard_history.csv"
+ANOMALY_FILE = "scorecard_anomalies.csv"
+HISTORY_COLUMNS = ['Scorecard ID', 'Recorded At', 'Client Name', 'Campaign Type',
+                   'Phase', 'Category', 'Metric', 'Score']
+# Read text columns back as strings so e.g. a client named "2024" still matches new scorecards
+HISTORY_DTYPES = {'Scorecard ID': str, 'Client Name': str, 'Campaign Type': str,
+                  'Phase': str, 'Category': str, 'Metric': str}
+
+# Every write uses the same timestamp format so the column always parses back as datetimes
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Streamlit sessions are threads of one server process; saves are read-modify-write, so serialize them
+_write_lock = threading.RLock()
+
+# Campaign fields that identify a scorecard; re-saving the same campaign replaces it
+IDENTITY_FIELDS = ('Client Name', 'Campaign Name', 'Start Date', 'Campaign Type')
+
+# History scopes that anomalies are judged against
+SCOPES = ('Client Name', 'Campaign Type')
+
+ROLLING_WINDOW = 10     # Number of previous scorecards a score is compared with
+MIN_PERIODS = 3         # Minimum history before a z-score is trusted
+Z_THRESHOLD = -2.0      # Flag drops at least this many standard deviations below the rolling mean
+MIN_STD = 0.5           # Std floor so a first drop after a perfectly stable history still scores
+
+ANOMALY_COLUMNS = ['Scorecard ID', 'Recorded At', 'Scope', 'Scope Value', 'Phase', 'Level', 'Name',
+                   'Score', 'Baseline', 'Z-Score']
+ANOMALY_DTYPES = {'Scorecard ID': str, 'Scope': str, 'Scope Value': str, 'Phase': str,
+                  'Level': str, 'Name': str}
+
+
+def campaign_id(scorecard):
+    """Stable id of the campaign a scorecard belongs to, independent of scores and comments."""
+    campaign = scorecard.get("campaign", {})
+    return scorecard_hash({field: campaign.get(field, "") for field in IDENTITY_FIELDS})
+
+
+def scorecard_to_records(scorecard, recorded_at=None):
+    """Flatten a scorecard into one long-format row per scored metric."""
+    campaign = scorecard.get("campaign", {})
+    recorded_at = recorded_at or datetime.now()
+    scorecard_id = campaign_id(scorecard)
+    data = []
+    for phase in ('pre', 'post'):
+        scores = scorecard.get(f"{phase}_scores", {})
+        for category, metrics in scorecard.get(f"{phase}_metrics", {}).items():
+            for metric in metrics:
+                data.append({
+                    'Scorecard ID': scorecard_id,
+                    'Recorded At': recorded_at,
+                    'Client Name': campaign.get("Client Name", ""),
+                    'Campaign Type': campaign.get("Campaign Type", ""),
+                    'Phase': 'Pre-Campaign' if phase == 'pre' else 'Post-Campaign',
+                    'Category': category,
+                    'Metric': metric,
+                    'Score': scores.get(f"{phase}_{category}_{metric}", 0),
+                })
+    return pd.DataFrame(data, columns=HISTORY_COLUMNS)
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    history = pd.read_csv(path, keep_default_na=False, dtype=HISTORY_DTYPES)
+    history['Recorded At'] = pd.to_datetime(history['Recorded At'], format='ISO8601')
+    history['Score'] = pd.to_numeric(history['Score'])
+    return history
+
+
+def _write_csv(frame, path):
+    """Replace a CSV atomically, so readers never see a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            frame.to_csv(f, index=False, date_format=DATE_FORMAT)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _append_csv(frame, path):
+    # Caller holds _write_lock
+    frame.to_csv(path, mode='a', index=False, header=not os.path.exists(path), date_format=DATE_FORMAT)
+
+
+def append_scorecard(scorecard, path=HISTORY_FILE, recorded_at=None):
+    """Append a scorecard to the history file and return its records.
+
+    A campaign that is already stored is replaced in place, keeping its
+    original recorded time, so edits never count twice in the baseline.
+    """
+    records = scorecard_to_records(scorecard, recorded_at)
+    with _write_lock:
+        history = load_history(path)
+        stored = history['Scorecard ID'] == campaign_id(scorecard)
+        if stored.any():
+            records['Recorded At'] = history.loc[stored, 'Recorded At'].iloc[0]
+            _write_csv(pd.concat([history[~stored], records], ignore_index=True), path)
+        else:
+            _append_csv(records, path)
+    return records
+
+
+def _series_by_level(records):
+    """Per-scorecard score series at metric level plus category averages."""
+    metric_level = records.assign(Level='Metric', Name=records['Metric'])
+    category_level = (
+        records.groupby(['Scorecard ID', 'Recorded At', 'Client Name', 'Campaign Type', 'Phase', 'Category'],
+                        as_index=False, sort=False)['Score'].mean()
+        .assign(Level='Category', Name=lambda df: df['Category'])
+    )
+    return pd.concat([metric_level, category_level], ignore_index=True)
+
+
+def score_anomalies(records, window=ROLLING_WINDOW, min_periods=MIN_PERIODS):
+    """Rolling z-score of every score against the same metric/category's prior history.
+
+    Each score is compared with the mean and standard deviation of the previous
+    ``window`` scorecards within each scope (client, campaign type), so the
+    current value never contributes to its own baseline.
+    """
+    series = _series_by_level(records)
+    frames = []
+    for scope in SCOPES:
+        scoped = series[series[scope] != ""].sort_values('Recorded At', kind='stable').copy()
+        keys = [scope, 'Phase', 'Level', 'Name']
+        # Shift within each group so the baseline only sees earlier scorecards
+        scoped['Previous'] = scoped.groupby(keys, sort=False)['Score'].shift(1)
+        rolling = scoped.groupby(keys, sort=False)['Previous'].rolling(window, min_periods=min_periods)
+        scoped['Baseline'] = rolling.mean().droplevel(list(range(len(keys))))
+        baseline_std = rolling.std(ddof=0).droplevel(list(range(len(keys))))
+        scoped['Z-Score'] = (scoped['Score'] - scoped['Baseline']) / baseline_std.clip(lower=MIN_STD)
+        scoped['Scope'] = scope
+        scoped['Scope Value'] = scoped[scope]
+        frames.append(scoped.drop(columns='Previous'))
+    return pd.concat(frames, ignore_index=True)
+
+
+def flag_anomalies(scored, z_threshold=Z_THRESHOLD):
+    flagged = scored[scored['Z-Score'] <= z_threshold]
+    return flagged.sort_values('Z-Score')[ANOMALY_COLUMNS].reset_index(drop=True)
+
+
+def detect_new_anomalies(history, new_records, window=ROLLING_WINDOW, z_threshold=Z_THRESHOLD):
+    """Flag unusual drops in newly arrived scorecards only.
+
+    Only the last ``window`` scorecards per client and per campaign type are
+    needed as baseline, so the cost stays flat as the history grows.
+    """
+    if new_records.empty or history.empty:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    new_ids = set(new_records['Scorecard ID'])
+    history = history[~history['Scorecard ID'].isin(new_ids)]
+    baseline_ids = set()
+    for scope in SCOPES:
+        relevant = history[history[scope].isin(new_records[scope].unique())]
+        recent = (relevant.drop_duplicates('Scorecard ID')
+                  .sort_values('Recorded At', kind='stable')
+                  .groupby(scope).tail(window))
+        baseline_ids.update(recent['Scorecard ID'])
+    baseline = history[history['Scorecard ID'].isin(baseline_ids)]
+    scored = score_anomalies(pd.concat([baseline, new_records], ignore_index=True), window)
+    return flag_anomalies(scored[scored['Scorecard ID'].isin(new_ids)], z_threshold)
+
+
+def load_anomalies(path=ANOMALY_FILE):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    anomalies = pd.read_csv(path, keep_default_na=False, dtype=ANOMALY_DTYPES)
+    anomalies['Recorded At'] = pd.to_datetime(anomalies['Recorded At'], format='ISO8601')
+    anomalies[['Score', 'Baseline', 'Z-Score']] = anomalies[['Score', 'Baseline', 'Z-Score']].apply(pd.to_numeric)
+    return anomalies
+
+
+def ingest_scorecard(scorecard, history_path=HISTORY_FILE, anomaly_path=ANOMALY_FILE):
+    """Store a scorecard and log its anomalies against the history that preceded it.
+
+    Re-saving a stored campaign replaces both its history rows and its logged
+    anomalies. Returns the flagged anomalies and whether a campaign was replaced.
+    """
+    with _write_lock:
+        history = load_history(history_path)
+        scorecard_id = campaign_id(scorecard)
+        replaced = bool((history['Scorecard ID'] == scorecard_id).any())
+        records = append_scorecard(scorecard, history_path)
+        anomalies = detect_new_anomalies(history, records)
+        if replaced and os.path.exists(anomaly_path):
+            logged = load_anomalies(anomaly_path)
+            _write_csv(pd.concat([logged[logged['Scorecard ID'] != scorecard_id], anomalies], ignore_index=True),
+                       anomaly_path)
+        elif not anomalies.empty:
+            _append_csv(anomalies, anomaly_path)
+    return anomalies, replaced
+
+
+def recurring_anomalies(anomalies, history, recent=ROLLING_WINDOW):
+    """Count logged drops per metric/category across the most recent scorecards.
+
+    Metrics that keep getting flagged across different campaigns point to
+    systemic vendor or approval problems rather than one-off misses.
+    """
+    if anomalies.empty or history.empty:
+        return pd.DataFrame(columns=['Phase', 'Level', 'Name', 'Flags', 'Worst Z-Score'])
+    recent_ids = (history.drop_duplicates('Scorecard ID')
+                  .sort_values('Recorded At', kind='stable')
+                  .tail(recent)['Scorecard ID'])
+    flagged = anomalies[anomalies['Scorecard ID'].isin(recent_ids)]
+    return (flagged.groupby(['Phase', 'Level', 'Name'])
+            .agg(Flags=('Scorecard ID', 'nunique'), **{'Worst Z-Score': ('Z-Score', 'min')})
+            .sort_values(['Flags', 'Worst Z-Score'], ascending=[False, True])
+            .reset_index())
@@ -2,9 +2,18 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime
-from openpyxl.styles import Font, PatternFill
+import json
+import os
+from report_jobs import DONE, FAILED, ReportJobQueue
+from report_pipeline import REPORT_FORMATS
+from scorecard_engine import (
+    CAMPAIGN_TYPES, METRIC_DEFINITIONS, POST_METRICS_BASE, SCORE_OPTIONS, areas_for_focus,
+    available_pre_categories, compare_categories, create_category_df, phase_percentage, select_metrics
+)
+from scorecard_history import (
+    ANOMALY_FILE, HISTORY_FILE, detect_new_anomalies, ingest_scorecard, load_anomalies, load_history,
+    recurring_anomalies, scorecard_to_records
+)
 
 # Updated CSS with red changed to blue (#0066FF)
 st.markdown("""
@@ -277,6 +286,78 @@ def update_plot_theme(fig):
     )
     return fig
 
+def file_version(path):
+    # Modification time keys the cached frames, so a save from any session invalidates them
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+@st.cache_data(max_entries=1)
+def cached_history(path, version):
+    return load_history(path)
+
+@st.cache_data(max_entries=1)
+def cached_recurring_anomalies(history_path, history_version, anomaly_path, anomaly_version):
+    return recurring_anomalies(load_anomalies(anomaly_path), cached_history(history_path, history_version))
+
+@st.cache_resource
+def get_report_job_queue():
+    # One worker pool shared by all sessions so bulk exports run outside the script rerun
+    return ReportJobQueue()
+
+def report_jobs_pending(job_queue):
+    return not all(job_queue.is_finished(kind, job_id) for kind, job_id in st.session_state.report_jobs)
+
+def report_jobs_panel(polling):
+    # Runs as a fragment that reruns every few seconds while jobs are still running
+    job_queue = get_report_job_queue()
+    st.markdown("**Report Jobs**")
+    collected = []
+    for index, (kind, job_id) in enumerate(st.session_state.report_jobs):
+        if kind == 'job':
+            job = job_queue.job(job_id)
+            if job is None:
+                collected.append((kind, job_id))
+                continue
+            label = f"{job['campaign_name'] or 'Untitled campaign'} ({job['format'].upper()})"
+            if job['status'] == DONE:
+                if st.download_button(
+                    label=f"Download {label}",
+                    data=job['data'],
+                    file_name=job['file_name'],
+                    mime=REPORT_FORMATS[job['format']][1],
+                    key=f"download_job_{job_id}"
+                ):
+                    job_queue.discard([job_id])
+                    collected.append((kind, job_id))
+            elif job['status'] == FAILED:
+                st.error(f"{label} failed: {job['error']}")
+            else:
+                st.write(f"• {label}: {job['status']}")
+        else:
+            jobs = job_queue.batch_jobs(job_id)
+            if not jobs:
+                collected.append((kind, job_id))
+                continue
+            progress = job_queue.batch_progress(job_id)
+            finished = sum(job['status'] in (DONE, FAILED) for job in jobs)
+            st.progress(progress, text=f"Batch {index + 1}: {finished}/{len(jobs)} reports")
+            for job in jobs:
+                if job['status'] == FAILED:
+                    st.error(f"{job['campaign_name'] or 'Untitled campaign'} failed: {job['error']}")
+            if progress == 1:
+                if st.download_button(
+                    label=f"Download Batch {index + 1} (ZIP)",
+                    data=job_queue.batch_archive(job_id),
+                    file_name=f"scorecard_reports_{job_id[:8]}.zip",
+                    mime="application/zip",
+                    key=f"download_batch_{job_id}"
+                ):
+                    job_queue.discard([job['id'] for job in jobs])
+                    collected.append((kind, job_id))
+    st.session_state.report_jobs = [entry for entry in st.session_state.report_jobs if entry not in collected]
+    if polling and not report_jobs_pending(job_queue):
+        # Everything finished: rerun once without the timer so idle pages stop polling
+        st.rerun()
+
 def create_campaign_scorecard():
     # Initialize session state
     if 'pre_scores' not in st.session_state:
@@ -286,74 +367,14 @@ def create_campaign_scorecard():
     if 'comments' not in st.session_state:
         st.session_state.comments = {}
 
-    # Define metric_definitions
-    metric_definitions = {
-        # Common Pre-Campaign Metrics (All Campaigns)
-        'Assets received on time': 'Measures if all creative assets were delivered by the scheduled date.',
-        'Storyboard approvals met deadlines': 'Checks if storyboard approvals were completed on time.',
-        'Creative meets format & resolution': 'Ensures creative assets meet required formats and resolution standards.',
-        'Workback schedule followed': 'Verifies if the production timeline was adhered to as planned.',
-        'Vendor deadlines met': 'Confirms if external vendors met their deadlines.',
-        'Final creative delivered on time': 'Ensures the final creative was delivered by the deadline.',
-        'Billboard locations confirmed': 'Verifies that billboard placements were secured and confirmed.',
-        'Vendor tests & pre-launch checks done': 'Confirms all pre-launch tests and checks by vendors were completed.',
-        'Client Approvals Responsiveness': 'Evaluates client responsiveness during approval processes.',
-        # Strategy Category (All Campaigns)
-        'QR Code Added': 'Checks if a QR code was included in the campaign materials.',
-        'Clear CTA': 'Ensures the campaign includes a clear Call-to-Action.',
-        'Hashtag': 'Confirms a campaign-specific hashtag was created and implemented.',
-        # TikTok-Only Pre-Campaign Metrics
-        'TikTok Platform Compliance': 'Ensures content meets TikTok’s platform-specific rules.',
-        'TikTok Ad Moderation Passed': 'Confirms TikTok ads passed moderation checks.',
-        'TikTok Branded Mission': 'Verifies alignment with TikTok’s branded mission feature.',
-        'TikTok Branded Effects': 'Confirms branded effects were implemented on TikTok.',
-        'Creators Approval / responsiveness': 'Assesses responsiveness of creators during approvals.',
-        'Creators UGC Approvals': 'Confirms approval of user-generated content from creators.',
-        # Common Post-Campaign Metrics (All Campaigns)
-        'High-quality images captured': 'Ensures campaign visuals meet quality standards.',
-        'Splash video created': 'Confirms a promotional video was produced.',
-        'Social media features': 'Tracks use of social media features like stories or reels.',
-        'Key wins identified': 'Highlights successful aspects of the campaign.',
-        'Areas for improvement noted': 'Identifies aspects needing enhancement.',
-    }
-
-    # Define recommendations for automated insights
-    recommendations = {
-        'Assets received on time': 'Set earlier internal deadlines or improve coordination with asset providers.',
-        'Storyboard approvals met deadlines': 'Streamline the approval process with clearer timelines.',
-        'Creative meets format & resolution': 'Review asset specifications with the creative team before submission.',
-        'Workback schedule followed': 'Enhance timeline visibility with project management tools.',
-        'Vendor deadlines met': 'Increase vendor oversight or negotiate stricter deadlines.',
-        'Final creative delivered on time': 'Implement buffer periods or escalate delays earlier.',
-        'Billboard locations confirmed': 'Confirm locations earlier in the planning phase.',
-        'Vendor tests & pre-launch checks done': 'Schedule pre-launch checks earlier to catch issues.',
-        'Client Approvals Responsiveness': 'Schedule regular check-ins to expedite client feedback.',
-        'QR Code Added': 'Ensure QR code inclusion is part of the initial creative brief.',
-        'Clear CTA': 'Test CTAs with a focus group to ensure clarity.',
-        'Hashtag': 'Promote hashtag usage earlier in the campaign.',
-        'TikTok Platform Compliance': 'Train team on TikTok guidelines or consult platform experts.',
-        'TikTok Ad Moderation Passed': 'Submit ads earlier to allow time for revisions.',
-        'TikTok Branded Mission': 'Align mission with TikTok trends for better traction.',
-        'TikTok Branded Effects': 'Test effects with a small audience before full rollout.',
-        'Creators Approval / responsiveness': 'Set clear response deadlines for creators.',
-        'Creators UGC Approvals': 'Simplify UGC approval process with predefined criteria.',
-        'High-quality images captured': 'Invest in better equipment or training for photography team.',
-        'Splash video created': 'Plan video production earlier to ensure quality.',
-        'Social media features': 'Experiment with additional features like polls or live streams.',
-        'Key wins identified': 'Document wins in real-time during the campaign.',
-        'Areas for improvement noted': 'Conduct a post-mortem meeting to identify gaps.'
-    }
-
-    score_options = {
-        0: "0 - No/Poor",
-        3: "3 - Partial/Medium",
-        5: "5 - Yes/Excellent"
-    }
+    # Metric catalog shared with the report pipeline and the scoring API
+    metric_definitions = METRIC_DEFINITIONS
+    score_options = SCORE_OPTIONS
 
     # Campaign Information with Category Filter
     with st.container():
         st.markdown('<div class="stContainer"><div class="stHeader">Campaign Information</div>', unsafe_allow_html=True)
-        campaign_type = st.selectbox("Campaign Type", ["TikTok Campaign", "DIVE Campaign", "BYOB"], key="campaign_type")
+        campaign_type = st.selectbox("Campaign Type", CAMPAIGN_TYPES, key="campaign_type")
         campaign_name = st.text_input("Campaign Name", key="campaign_name")
         start_date = st.date_input("Start Date", key="start_date")
         end_date = st.date_input("End Date", key="end_date")
@@ -361,60 +382,15 @@ def create_campaign_scorecard():
         country = st.text_input("Country", key="country")
         cities = st.text_input("Cities", key="cities", help="Enter cities separated by commas")
         
-        # Define base metrics for filtering
-        pre_metrics_base = {
-            'Creative Readiness': [
-                'Assets received on time',
-                'Storyboard approvals met deadlines',
-                'Creative meets format & resolution'
-            ],
-            'Production Timeline': [
-                'Workback schedule followed',
-                'Vendor deadlines met',
-                'Final creative delivered on time'
-            ],
-            'Placement & Inventory': [
-                'Billboard locations confirmed'
-            ],
-            'Approval & Compliance': [
-                'Vendor tests & pre-launch checks done',
-                'Client Approvals Responsiveness'
-            ],
-            'Strategy': [
-                'QR Code Added',
-                'Clear CTA',
-                'Hashtag'
-            ],
-            'TikTok Specific': [
-                'TikTok Platform Compliance',
-                'TikTok Ad Moderation Passed',
-                'TikTok Branded Mission',
-                'TikTok Branded Effects',
-                'Creators Approval / responsiveness',
-                'Creators UGC Approvals'
-            ]
-        }
-        post_metrics_base = {
-            'Photography & Visibility': [
-                'High-quality images captured',
-                'Splash video created',
-                'Social media features'
-            ],
-            'Campaign Learnings': [
-                'Key wins identified',
-                'Areas for improvement noted'
-            ]
-        }
-
         # Interactive Metric Filtering
-        all_pre_categories = [cat for cat in pre_metrics_base.keys() if cat != 'TikTok Specific' or campaign_type == "TikTok Campaign"]
+        all_pre_categories = available_pre_categories(campaign_type)
         selected_pre_categories = st.multiselect(
             "Select Pre-Campaign Categories to Score",
             all_pre_categories,
             default=all_pre_categories,
             key="pre_category_filter"
         )
-        all_post_categories = list(post_metrics_base.keys())
+        all_post_categories = list(POST_METRICS_BASE.keys())
         selected_post_categories = st.multiselect(
             "Select Post-Campaign Categories to Score",
             all_post_categories,
@@ -424,11 +400,7 @@ def create_campaign_scorecard():
         st.markdown('</div>', unsafe_allow_html=True)
 
     # Filter pre_metrics and post_metrics based on user selection
-    pre_metrics = {}
-    for category, metrics in pre_metrics_base.items():
-        if category in selected_pre_categories and (campaign_type != "TikTok Campaign" or category != 'TikTok Specific' or 'TikTok Specific' in selected_pre_categories):
-            pre_metrics[category] = metrics
-    post_metrics = {cat: post_metrics_base[cat] for cat in selected_post_categories if cat in post_metrics_base}
+    pre_metrics, post_metrics = select_metrics(campaign_type, selected_pre_categories, selected_post_categories)
 
     # Clean up session state to only include current metrics
     valid_pre_keys = {f"pre_{cat}_{metric}" for cat, metrics in pre_metrics.items() for metric in metrics}
@@ -485,59 +457,18 @@ def create_campaign_scorecard():
         st.markdown('</div>', unsafe_allow_html=True)
 
     # Calculate totals as percentages
-    pre_total = sum(st.session_state.pre_scores.values()) if st.session_state.pre_scores else 0
-    post_total = sum(st.session_state.post_scores.values()) if st.session_state.post_scores else 0
-    pre_max = len([metric for metrics in pre_metrics.values() for metric in metrics]) * 5
-    post_max = len([metric for metrics in post_metrics.values() for metric in metrics]) * 5
-
-    pre_percentage = (pre_total / pre_max * 100) if pre_max > 0 else 0
-    post_percentage = (post_total / post_max * 100) if post_max > 0 else 0
-    pre_progress = pre_percentage / 100 if pre_max > 0 else 0
-    post_progress = post_percentage / 100 if post_max > 0 else 0
-
-    # Get unique categories
-    categories = list(set(list(pre_metrics.keys()) + list(post_metrics.keys())))
+    pre_percentage = phase_percentage(st.session_state.pre_scores, pre_metrics, 'pre')
+    post_percentage = phase_percentage(st.session_state.post_scores, post_metrics, 'post')
+    pre_progress = pre_percentage / 100
+    post_progress = post_percentage / 100
 
     # Create DataFrames for visualization
-    def create_category_df(scores_dict, metrics_dict, phase):
-        data = []
-        for category, metrics in metrics_dict.items():
-            category_scores = [scores_dict.get(f"{phase}_{category}_{metric}", 0) for metric in metrics]
-            avg_score = np.mean(category_scores) if category_scores else 0
-            data.append({
-                'Category': category,
-                'Average Score': avg_score,
-                'Phase': 'Pre-Campaign' if phase == 'pre' else 'Post-Campaign'
-            })
-        return pd.DataFrame(data)
-
     pre_df = create_category_df(st.session_state.pre_scores, pre_metrics, 'pre')
     post_df = create_category_df(st.session_state.post_scores, post_metrics, 'post')
     combined_df = pd.concat([pre_df, post_df]).dropna()
 
     # Calculate improvements and declines
-    improvements = []
-    declines = []
-    common_categories = set(pre_df['Category']).intersection(set(post_df['Category']))
-    
-    for category in common_categories:
-        try:
-            pre_score = pre_df[pre_df['Category'] == category]['Average Score'].iloc[0] if not pre_df[pre_df['Category'] == category].empty else 0
-            post_score = post_df[post_df['Category'] == category]['Average Score'].iloc[0] if not post_df[post_df['Category'] == category].empty else 0
-            pre_percent = (pre_score / 5) * 100 if pre_score > 0 else 0
-            post_percent = (post_score / 5) * 100 if post_score > 0 else 0
-            if pre_percent == 0 and post_percent == 0:
-                continue
-            elif pre_percent == 0 and post_percent > 0:
-                improvements.append((category, post_percent))
-            else:
-                diff = post_percent - pre_percent
-                if diff > 0:
-                    improvements.append((category, diff))
-                elif diff < 0:
-                    declines.append((category, abs(diff)))
-        except (IndexError, KeyError):
-            continue
+    improvements, declines = compare_categories(pre_df, post_df)
 
     # Display totals and visualizations
     with st.container():
@@ -666,77 +597,126 @@ def create_campaign_scorecard():
                     st.write("No improvements detected")
             with col2:
                 st.markdown("**Areas for Focus:**")
-                low_scores = [(key.split('_')[-1], score) for key, score in {**st.session_state.pre_scores, **st.session_state.post_scores}.items() if score < 3]
+                low_scores = areas_for_focus(st.session_state.pre_scores, st.session_state.post_scores)
                 if low_scores:
-                    low_scores.sort(key=lambda x: x[1])  # Sort by score (lowest first)
-                    for metric, score in low_scores[:3]:
-                        st.write(f"• {metric} ({score_options[score]}): {recommendations.get(metric, 'Review process for improvement.')}")
+                    for metric, score, recommendation in low_scores:
+                        st.write(f"• {metric} ({score_options[score]}): {recommendation}")
                 else:
                     st.write("No areas for focus detected")
             st.markdown('</div>', unsafe_allow_html=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # Create Excel download
+    # Report downloads (Excel, HTML, PDF) rendered from one report model
+    scorecard = {
+        "campaign": {
+            "Campaign Type": campaign_type,
+            "Campaign Name": campaign_name,
+            "Start Date": start_date.strftime("%Y-%m-%d"),
+            "End Date": end_date.strftime("%Y-%m-%d"),
+            "Client Name": client_name,
+            "Country": country,
+            "Cities": cities,
+        },
+        "pre_metrics": pre_metrics,
+        "post_metrics": post_metrics,
+        "pre_scores": dict(st.session_state.pre_scores),
+        "post_scores": dict(st.session_state.post_scores),
+        "comments": {k: v for k, v in st.session_state.comments.items() if k in valid_pre_keys | valid_post_keys},
+    }
+
+    # Compare this scorecard against stored history for the client and campaign type
+    with st.container():
+        st.markdown('<div class="stContainer"><div class="stHeader">Historical Anomalies</div>', unsafe_allow_html=True)
+        history = cached_history(HISTORY_FILE, file_version(HISTORY_FILE))
+        current_records = scorecard_to_records(scorecard)
+        anomalies = detect_new_anomalies(history, current_records)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Unusual Drops in This Scorecard:**")
+            if not anomalies.empty:
+                for _, row in anomalies.head(5).iterrows():
+                    st.write(
+                        f"• {row['Name']} ({row['Phase']}): {row['Score']:.1f} vs {row['Baseline']:.1f} "
+                        f"average for {row['Scope Value']} (z = {row['Z-Score']:.1f})"
+                    )
+            elif history.empty:
+                st.write("No stored scorecards yet")
+            else:
+                st.write("No unusual drops detected")
+        with col2:
+            st.markdown("**Recurring Problems (Recent Scorecards):**")
+            recurring = cached_recurring_anomalies(HISTORY_FILE, file_version(HISTORY_FILE),
+                                                   ANOMALY_FILE, file_version(ANOMALY_FILE))
+            recurring = recurring[recurring['Flags'] > 1]
+            if not recurring.empty:
+                for _, row in recurring.head(5).iterrows():
+                    st.write(f"• {row['Name']} ({row['Phase']}): flagged in {row['Flags']} scorecards")
+            else:
+                st.write("No recurring problems detected")
+        if st.button("Save Scorecard to History", key="save_history", help="Store this scorecard so future scorecards are compared against it"):
+            _, replaced = ingest_scorecard(scorecard)
+            cached_history.clear()
+            cached_recurring_anomalies.clear()
+            if replaced:
+                st.success("Stored scorecard for this campaign updated")
+            else:
+                st.success("Scorecard saved to history")
+        st.markdown('</div>', unsafe_allow_html=True)
+
     with st.container():
         st.markdown('<div class="stContainer">', unsafe_allow_html=True)
-        if st.button("Generate Report", key="generate_report", help="Download the scorecard as an Excel file"):
-            data = []
-            data.append(["Campaign Information", "", "", ""])
-            data.append(["Campaign Type", campaign_type, "", ""])
-            data.append(["Campaign Name", campaign_name, "", ""])
-            data.append(["Start Date", start_date.strftime("%Y-%m-%d"), "", ""])
-            data.append(["End Date", end_date.strftime("%Y-%m-%d"), "", ""])
-            data.append(["Client Name", client_name, "", ""])
-            data.append(["Country", country, "", ""])
-            data.append(["Cities", cities, "", ""])
-            data.append(["", "", "", ""])
-            data.append(["Pre-Campaign Scorecard", "", "", ""])
-            data.append(["Category", "Metric", "Score", "Comments"])
-            for category, metrics in pre_metrics.items():
-                for metric in metrics:
-                    key = f"pre_{category}_{metric}"
-                    data.append([
-                        category,
-                        metric,
-                        st.session_state.pre_scores.get(key, 0),
-                        st.session_state.comments.get(key, "")
-                    ])
-            data.append(["", "", "", ""])
-            data.append(["Post-Campaign Scorecard", "", "", ""])
-            data.append(["Category", "Metric", "Score", "Comments"])
-            for category, metrics in post_metrics.items():
-                for metric in metrics:
-                    key = f"post_{category}_{metric}"
-                    data.append([
-                        category,
-                        metric,
-                        st.session_state.post_scores.get(key, 0),
-                        st.session_state.comments.get(key, "")
-                    ])
-            data.append(["", "", "", ""])
-            data.append(["Score Summary", "", "", ""])
-            data.append(["Pre-Campaign Score", f"{pre_percentage:.1f}%", "", ""])
-            data.append(["Post-Campaign Score", f"{post_percentage:.1f}%", "", ""])
-            
-            df = pd.DataFrame(data)
-            excel_file = f"{campaign_type.lower().replace(' ', '_')}_scorecard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, header=False)
-                workbook = writer.book
-                worksheet = writer.sheets['Sheet1']
-                header_fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
-                for cell in worksheet['1:1']:
-                    cell.font = Font(bold=True)
-                    cell.fill = header_fill
-            with open(excel_file, 'rb') as f:
-                st.download_button(
-                    label="Download Excel Report",
-                    data=f,
-                    file_name=excel_file,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key="download_button"
-                )
+        report_format = st.selectbox(
+            "Report Format",
+            list(REPORT_FORMATS.keys()),
+            format_func=lambda x: {"excel": "Excel", "html": "HTML", "pdf": "PDF"}[x],
+            key="report_format"
+        )
+        if 'report_jobs' not in st.session_state:
+            st.session_state.report_jobs = []
+        job_queue = get_report_job_queue()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Generate Report", key="generate_report", help="Queue the scorecard as an Excel, HTML or PDF report"):
+                st.session_state.report_jobs.append(('job', job_queue.submit(scorecard, report_format)))
+        with col2:
+            st.download_button(
+                label="Export Scorecard JSON",
+                data=json.dumps(scorecard, indent=2),
+                file_name=f"{campaign_type.lower().replace(' ', '_')}_scorecard.json",
+                mime="application/json",
+                key="export_scorecard_json",
+                help="Save this scorecard so it can be included in a bulk report batch"
+            )
+
+        with st.expander("Bulk Reports", expanded=False):
+            uploaded_files = st.file_uploader(
+                "Upload exported scorecard JSON files",
+                type="json",
+                accept_multiple_files=True,
+                key="bulk_scorecards"
+            )
+            if st.button("Queue Bulk Reports", key="queue_bulk_reports", disabled=not uploaded_files):
+                scorecards = []
+                for uploaded_file in uploaded_files:
+                    try:
+                        payload = json.load(uploaded_file)
+                    except ValueError:
+                        st.error(f"{uploaded_file.name} is not valid JSON")
+                        continue
+                    entries = payload if isinstance(payload, list) else [payload]
+                    valid = [entry for entry in entries if isinstance(entry, dict)]
+                    if len(valid) < len(entries):
+                        st.error(f"{uploaded_file.name}: skipped {len(entries) - len(valid)} entries that are not scorecard objects")
+                    scorecards.extend(valid)
+                if scorecards:
+                    st.session_state.report_jobs.append(('batch', job_queue.submit_batch(scorecards, report_format)))
+
+        # Finished reports become downloadable as the jobs panel polls the queue
+        if st.session_state.report_jobs:
+            polling = report_jobs_pending(job_queue)
+            st.fragment(report_jobs_panel, run_every=2 if polling else None)(polling)
         st.markdown('</div>', unsafe_allow_html=True)
 
 if __name__ == "__main__":
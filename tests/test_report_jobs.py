@@ -0,0 +1,115 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import report_jobs
+import report_pipeline
+from report_jobs import DONE, FAILED, ReportJobQueue
+
+
+class ThreadReportJobQueue(ReportJobQueue):
+    """Runs jobs on threads so tests don't spawn worker processes."""
+
+    def _new_executor(self):
+        return ThreadPoolExecutor(max_workers=2)
+
+
+def scorecard(name):
+    return {"campaign": {"Campaign Type": "DIVE Campaign", "Campaign Name": name}}
+
+
+def fake_build_report(scorecard, fmt):
+    name = scorecard["campaign"]["Campaign Name"]
+    if name == "boom":
+        raise RuntimeError("render failed")
+    return "same_name.html", f"<p>{name}</p>".encode()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def fake_renderer(monkeypatch):
+    monkeypatch.setattr(report_jobs, "_build_report", fake_build_report)
+    report_pipeline._render_cache.clear()
+    yield
+    report_pipeline._render_cache.clear()
+
+
+@pytest.fixture
+def queue():
+    queue = ThreadReportJobQueue()
+    yield queue
+    queue.shutdown()
+
+
+def test_batch_progress_failures_and_archive(queue):
+    batch_id = queue.submit_batch([scorecard("a"), scorecard("boom"), scorecard("b")], "html")
+    wait_for(lambda: queue.batch_progress(batch_id) == 1)
+
+    statuses = {job['campaign_name']: job for job in queue.batch_jobs(batch_id)}
+    assert statuses['a']['status'] == DONE
+    assert statuses['boom']['status'] == FAILED
+    assert statuses['boom']['error'] == "render failed"
+    assert queue.is_finished('batch', batch_id)
+
+    archive = queue.batch_archive(batch_id)
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        names = zf.namelist()
+        assert names == ["same_name.html", "003_same_name.html"]
+        assert {zf.read(name) for name in names} == {b"<p>a</p>", b"<p>b</p>"}
+    assert queue.batch_archive(batch_id) is archive
+
+
+def test_finished_job_is_served_from_render_cache(queue, monkeypatch):
+    job_id = queue.submit(scorecard("a"), "html")
+    wait_for(lambda: queue.is_finished('job', job_id))
+
+    monkeypatch.setattr(report_jobs, "_build_report", lambda *args: pytest.fail("should hit the cache"))
+    repeat = queue.job(queue.submit(scorecard("a"), "html"))
+    first = queue.job(job_id)
+    assert repeat['status'] == DONE
+    assert (repeat['file_name'], repeat['data']) == (first['file_name'], first['data'])
+
+
+def test_broken_pool_fails_job_and_recovers(queue):
+    broken = queue._executor
+
+    def raise_broken(*args, **kwargs):
+        raise BrokenProcessPool("worker died")
+    broken.submit = raise_broken
+
+    job = queue.job(queue.submit(scorecard("a"), "html"))
+    assert job['status'] == FAILED
+    assert "worker died" in job['error']
+    assert queue._executor is not broken
+
+    job_id = queue.submit(scorecard("b"), "html")
+    wait_for(lambda: queue.is_finished('job', job_id))
+    assert queue.job(job_id)['status'] == DONE
+
+
+def test_finished_jobs_expire_after_ttl():
+    queue = ThreadReportJobQueue(job_ttl=0)
+    try:
+        job_id = queue.submit(scorecard("a"), "html")
+        wait_for(lambda: queue.job(job_id) is None)
+    finally:
+        queue.shutdown()
+
+
+def test_discard_removes_collected_batch(queue):
+    batch_id = queue.submit_batch([scorecard("a")], "html")
+    wait_for(lambda: queue.batch_progress(batch_id) == 1)
+    queue.batch_archive(batch_id)
+    queue.discard([job['id'] for job in queue.batch_jobs(batch_id)])
+    assert queue.batch_jobs(batch_id) == []
+    assert batch_id not in queue._archives
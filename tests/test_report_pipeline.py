@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+import report_pipeline
+from report_pipeline import (
+    _paginate_rows, _wrap_pdf_row, build_report_model, render_excel, render_html, render_pdf, render_report
+)
+
+SCORECARD = {
+    "campaign": {"Campaign Type": "DIVE Campaign", "Campaign Name": "Launch <Q1>", "Client Name": "Acme"},
+    "pre_metrics": {'Strategy': ['QR Code Added', 'Clear CTA']},
+    "post_metrics": {'Campaign Learnings': ['Key wins identified']},
+    "pre_scores": {"pre_Strategy_QR Code Added": 5, "pre_Strategy_Clear CTA": 0},
+    "post_scores": {"post_Campaign Learnings_Key wins identified": 3},
+    "comments": {"pre_Strategy_Clear CTA": "CTA was missing"},
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_render_cache():
+    report_pipeline._render_cache.clear()
+    yield
+    report_pipeline._render_cache.clear()
+
+
+def test_build_report_model_sections():
+    model = build_report_model(SCORECARD)
+    pre, post = model['sections']
+    assert pre['percentage'] == 50
+    assert pre['category_averages'] == [{'Category': 'Strategy', 'Average Score': 2.5}]
+    assert [row['Comments'] for row in pre['rows']] == ["", "CTA was missing"]
+    assert post['percentage'] == 60
+
+
+def test_render_excel_has_summary_and_phase_sheets():
+    workbook = load_workbook(io.BytesIO(render_excel(build_report_model(SCORECARD))))
+    assert workbook.sheetnames == ['Summary', 'Pre-Campaign', 'Post-Campaign']
+    pre_sheet = workbook['Pre-Campaign']
+    assert [cell.value for cell in pre_sheet[1]] == ['Category', 'Metric', 'Score', 'Comments']
+    assert pre_sheet['D3'].value == "CTA was missing"
+    assert all(cell.font.bold for cell in pre_sheet[1])
+
+
+def test_render_html_escapes_and_embeds_chart():
+    html = render_html(build_report_model(SCORECARD))
+    assert "Launch &lt;Q1&gt;" in html
+    assert "data:image/png;base64," in html
+    assert "CTA was missing" in html
+
+
+def test_render_pdf_produces_pdf():
+    assert render_pdf(build_report_model(SCORECARD)).startswith(b"%PDF")
+
+
+def test_pdf_rows_wrap_long_comments_without_dropping_text():
+    comment = "delayed approval " * 50
+    cells, lines = _wrap_pdf_row({'Category': 'Strategy', 'Metric': 'Clear CTA', 'Score': 0, 'Comments': comment})
+    assert lines > 1
+    assert cells[3].split() == comment.split()
+    pages = _paginate_rows([(cells, lines)] * 10)
+    assert len(pages) > 1
+    assert sum(len(page) for page in pages) == 10
+
+
+@pytest.mark.parametrize("fmt", ["excel", "html", "pdf"])
+def test_render_report_cache_hit_returns_same_file(fmt):
+    file_name, artifact = render_report(SCORECARD, fmt)
+    assert file_name.startswith("dive_campaign_scorecard_")
+    assert render_report(dict(SCORECARD), fmt) == (file_name, artifact)
+    assert len(report_pipeline._render_cache) == 1
+
+
+def test_render_report_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        render_report(SCORECARD, "docx")
@@ -0,0 +1,69 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import scorecard_api
+
+VALID = {
+    "campaign": {"Campaign Type": "DIVE Campaign"},
+    "pre_metrics": {'Strategy': ['QR Code Added']},
+    "post_metrics": {},
+    "pre_scores": {"pre_Strategy_QR Code Added": 5},
+    "post_scores": {},
+}
+INVALID = {**VALID, "pre_metrics": {'X': ['QR Code Added']}}
+
+
+def request(method, path, **kwargs):
+    async def run():
+        async with TestClient(TestServer(scorecard_api.create_app())) as client:
+            response = await client.request(method, path, **kwargs)
+            body = await response.json() if response.content_type == 'application/json' else await response.text()
+            return response.status, body
+    return asyncio.run(run())
+
+
+def test_score_returns_engine_result():
+    status, body = request("POST", "/score", json=VALID)
+    assert status == 200
+    assert body['pre_percentage'] == 100
+
+
+def test_score_rejects_metrics_outside_catalog():
+    status, body = request("POST", "/score", json=INVALID)
+    assert status == 400
+    assert "Unknown pre-campaign category" in body
+
+
+def test_batch_reports_errors_per_scorecard():
+    status, body = request("POST", "/score/batch", json={"scorecards": [VALID, INVALID, VALID]})
+    assert status == 200
+    assert [result['ok'] for result in body['results']] == [True, False, True]
+    assert body['results'][0]['result'] == body['results'][2]['result']
+    assert "Unknown pre-campaign category" in body['results'][1]['error']
+
+
+def test_batch_rejects_non_object_entries():
+    status, body = request("POST", "/score/batch", json={"scorecards": [VALID, "x"]})
+    assert status == 400
+    assert body == "Expected a list of scorecard objects"
+
+
+def test_batch_rejects_invalid_json():
+    status, body = request("POST", "/score/batch", data="{not json", headers={"Content-Type": "application/json"})
+    assert status == 400
+    assert body == "Request body must be valid JSON"
+
+
+def test_batch_size_limit_counts_scorecards(monkeypatch):
+    monkeypatch.setattr(scorecard_api, "MAX_BATCH_SIZE", 2)
+    status, body = request("POST", "/score/batch", json={"scorecards": [VALID] * 3})
+    assert status == 400
+    assert body == "At most 2 scorecards per batch"
+
+
+def test_identical_scorecards_are_served_from_cache():
+    scorecard_api._score_cache.clear()
+    first = scorecard_api.cached_score(VALID)
+    assert scorecard_api.cached_score(dict(VALID)) is first
+    assert len(scorecard_api._score_cache) == 1
@@ -0,0 +1,90 @@
+import pytest
+
+from scorecard_engine import POST_METRICS_BASE, PRE_METRICS_BASE, score_scorecard, select_metrics
+
+
+def make_scorecard(campaign_type="DIVE Campaign", pre_scores=None, post_scores=None, **extra):
+    return {
+        "campaign": {"Campaign Type": campaign_type},
+        "pre_scores": pre_scores or {},
+        "post_scores": post_scores or {},
+        **extra,
+    }
+
+
+def test_select_metrics_limits_tiktok_category_to_tiktok_campaigns():
+    dive_pre, dive_post = select_metrics("DIVE Campaign")
+    tiktok_pre, _ = select_metrics("TikTok Campaign")
+    assert 'TikTok Specific' not in dive_pre
+    assert 'TikTok Specific' in tiktok_pre
+    assert dive_post == POST_METRICS_BASE
+
+
+def test_select_metrics_filters_selected_categories():
+    pre, post = select_metrics("BYOB", ['Strategy', 'TikTok Specific'], ['Campaign Learnings'])
+    assert pre == {'Strategy': PRE_METRICS_BASE['Strategy']}
+    assert post == {'Campaign Learnings': POST_METRICS_BASE['Campaign Learnings']}
+
+
+def test_select_metrics_rejects_unknown_campaign_type():
+    with pytest.raises(ValueError):
+        select_metrics("Radio Campaign")
+
+
+def test_score_scorecard_percentages_and_category_changes():
+    scorecard = make_scorecard(
+        pre_metrics={'Strategy': ['QR Code Added', 'Clear CTA']},
+        post_metrics={'Campaign Learnings': ['Key wins identified']},
+        pre_scores={"pre_Strategy_QR Code Added": 5, "pre_Strategy_Clear CTA": 0},
+        post_scores={"post_Campaign Learnings_Key wins identified": 3},
+    )
+    result = score_scorecard(scorecard)
+    assert result['pre_percentage'] == 50
+    assert result['post_percentage'] == 60
+    assert result['category_averages'] == {'pre': {'Strategy': 2.5}, 'post': {'Campaign Learnings': 3.0}}
+    assert [r['metric'] for r in result['recommendations']] == ['Clear CTA']
+
+
+def test_score_scorecard_defaults_to_full_catalog():
+    result = score_scorecard(make_scorecard())
+    assert set(result['category_averages']['pre']) == set(select_metrics("DIVE Campaign")[0])
+    assert result['pre_percentage'] == 0
+
+
+def test_score_scorecard_empty_metrics_score_no_categories():
+    scorecard = make_scorecard(pre_metrics={}, post_metrics=None,
+                               post_scores={"post_Campaign Learnings_Key wins identified": 5})
+    result = score_scorecard(scorecard)
+    assert result['category_averages']['pre'] == {}
+    assert result['pre_percentage'] == 0
+    assert set(result['category_averages']['post']) == set(POST_METRICS_BASE)
+    assert result['improvements'] == [] and result['declines'] == []
+
+
+@pytest.mark.parametrize("pre_metrics", [
+    {'X': ['QR Code Added']},
+    {'Strategy': ['Not a metric']},
+    {'Strategy': 'QR Code Added'},
+    {'TikTok Specific': ['TikTok Branded Effects']},  # Not available for DIVE campaigns
+])
+def test_score_scorecard_rejects_metrics_outside_catalog(pre_metrics):
+    with pytest.raises(ValueError):
+        score_scorecard(make_scorecard(pre_metrics=pre_metrics))
+
+
+def test_score_scorecard_ignores_scores_outside_selected_metrics():
+    scorecard = make_scorecard(
+        pre_metrics={'Strategy': ['QR Code Added']},
+        pre_scores={"pre_Strategy_QR Code Added": 5, "pre_Strategy_Clear CTA": 0},
+        post_scores={"post_Foo_Bar": 0},
+    )
+    result = score_scorecard(scorecard)
+    assert result['pre_percentage'] == 100
+    assert result['recommendations'] == []
+
+
+def test_score_scorecard_rejects_invalid_score():
+    scorecard = make_scorecard(pre_metrics={'Strategy': ['QR Code Added']},
+                               pre_scores={"pre_Strategy_QR Code Added": 4})
+    with pytest.raises(ValueError):
+        score_scorecard(scorecard)
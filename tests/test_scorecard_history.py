@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from scorecard_history import (
+    append_scorecard, campaign_id, detect_new_anomalies, ingest_scorecard, load_anomalies, load_history,
+    score_anomalies, scorecard_to_records
+)
+
+PRE_METRICS = {'Production Timeline': ['Vendor deadlines met', 'Workback schedule followed']}
+START = datetime(2024, 1, 1)
+
+
+def make_scorecard(name, vendor_score, client="Acme", comment=""):
+    return {
+        "campaign": {"Campaign Type": "DIVE Campaign", "Campaign Name": name, "Client Name": client,
+                     "Start Date": "2024-01-01"},
+        "pre_metrics": PRE_METRICS,
+        "post_metrics": {},
+        "pre_scores": {
+            "pre_Production Timeline_Vendor deadlines met": vendor_score,
+            "pre_Production Timeline_Workback schedule followed": 5,
+        },
+        "post_scores": {},
+        "comments": {"pre_Production Timeline_Vendor deadlines met": comment},
+    }
+
+
+def history_of(scores, client="Acme"):
+    return pd.concat([
+        scorecard_to_records(make_scorecard(f"Campaign {i}", score, client), START + timedelta(days=i))
+        for i, score in enumerate(scores)
+    ], ignore_index=True)
+
+
+def test_baseline_excludes_current_scorecard():
+    scored = score_anomalies(history_of([5, 5, 5, 0]))
+    vendor = scored[(scored['Scope'] == 'Client Name') & (scored['Name'] == 'Vendor deadlines met')]
+    vendor = vendor.sort_values('Recorded At')
+    assert vendor['Baseline'].isna().tolist()[:3] == [True, True, True]
+    assert vendor['Baseline'].iloc[3] == 5
+    assert vendor['Z-Score'].iloc[3] == -10  # (0 - 5) / MIN_STD
+
+
+def test_detect_new_anomalies_flags_drop_in_both_scopes_and_category():
+    history = history_of([5, 5, 5, 5])
+    new_records = scorecard_to_records(make_scorecard("New", 0), START + timedelta(days=10))
+    flagged = detect_new_anomalies(history, new_records)
+    assert set(flagged['Scope']) == {'Client Name', 'Campaign Type'}
+    assert set(flagged['Name']) == {'Vendor deadlines met', 'Production Timeline'}
+    assert 'Workback schedule followed' not in set(flagged['Name'])
+
+
+def test_detect_new_anomalies_needs_min_periods():
+    history = history_of([5, 5])
+    new_records = scorecard_to_records(make_scorecard("New", 0), START + timedelta(days=10))
+    assert detect_new_anomalies(history, new_records).empty
+
+
+def test_numeric_client_name_survives_csv_round_trip(tmp_path):
+    path = tmp_path / "history.csv"
+    for i in range(4):
+        append_scorecard(make_scorecard(f"Campaign {i}", 5, client="2024"), path, START + timedelta(days=i))
+    history = load_history(path)
+    new_records = scorecard_to_records(make_scorecard("New", 0, client="2024"), START + timedelta(days=10))
+    flagged = detect_new_anomalies(history, new_records)
+    assert 'Client Name' in set(flagged['Scope'])
+    assert set(flagged.loc[flagged['Scope'] == 'Client Name', 'Scope Value']) == {"2024"}
+
+
+def test_resaving_campaign_replaces_stored_rows(tmp_path):
+    path = tmp_path / "history.csv"
+    append_scorecard(make_scorecard("Launch", 5), path, START)
+    append_scorecard(make_scorecard("Launch", 3, comment="edited"), path, START + timedelta(days=5))
+    history = load_history(path)
+    assert history['Scorecard ID'].nunique() == 1
+    assert len(history) == 2
+    assert (history['Recorded At'] == START).all()
+    assert history.loc[history['Metric'] == 'Vendor deadlines met', 'Score'].tolist() == [3]
+
+
+def test_campaign_id_ignores_scores_and_comments():
+    assert campaign_id(make_scorecard("Launch", 5)) == campaign_id(make_scorecard("Launch", 0, comment="late"))
+    assert campaign_id(make_scorecard("Launch", 5)) != campaign_id(make_scorecard("Other", 5))
+
+
+def test_ingest_replaces_logged_anomalies(tmp_path):
+    history_path, anomaly_path = tmp_path / "history.csv", tmp_path / "anomalies.csv"
+    for i in range(4):
+        append_scorecard(make_scorecard(f"Campaign {i}", 5, client="2024"), history_path, START + timedelta(days=i))
+
+    anomalies, replaced = ingest_scorecard(make_scorecard("New", 0, client="2024"), history_path, anomaly_path)
+    assert not replaced and not anomalies.empty
+    first_count = len(load_anomalies(anomaly_path))
+
+    anomalies, replaced = ingest_scorecard(make_scorecard("New", 0, client="2024", comment="edited"),
+                                           history_path, anomaly_path)
+    logged = load_anomalies(anomaly_path)
+    assert replaced
+    assert len(logged) == first_count
+    assert logged['Scope Value'].isin(["2024", "DIVE Campaign"]).all()
+
+
+def test_mixed_timestamp_formats_round_trip(tmp_path):
+    path = tmp_path / "history.csv"
+    # Files written before timestamps had a fixed format mix whole seconds and microseconds
+    for i, recorded_at in enumerate([datetime(2024, 1, 1, 10), datetime(2024, 1, 2, 10, 0, 0, 123456),
+                                     datetime(2024, 1, 3, 10)]):
+        records = scorecard_to_records(make_scorecard(f"Campaign {i}", 5), recorded_at)
+        records.to_csv(path, mode='a', index=False, header=not path.exists())
+    append_scorecard(make_scorecard("Campaign 3", 5), path, datetime(2024, 1, 4, 10, 30))
+
+    history = load_history(path)
+    assert pd.api.types.is_datetime64_any_dtype(history['Recorded At'])
+    assert history['Recorded At'].min() == datetime(2024, 1, 1, 10)
+
+    anomalies, _ = ingest_scorecard(make_scorecard("New", 0), path, tmp_path / "anomalies.csv")
+    assert not anomalies.empty
+    assert pd.api.types.is_datetime64_any_dtype(load_anomalies(tmp_path / "anomalies.csv")['Recorded At'])
+
+
+def test_concurrent_saves_keep_every_campaign_once(tmp_path):
+    history_path, anomaly_path = tmp_path / "history.csv", tmp_path / "anomalies.csv"
+    scorecards = [make_scorecard(f"Campaign {i % 5}", 5, comment=str(i)) for i in range(20)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda sc: ingest_scorecard(sc, history_path, anomaly_path), scorecards))
+    history = load_history(history_path)
+    assert history['Scorecard ID'].nunique() == 5
+    assert len(history) == 5 * len(PRE_METRICS['Production Timeline'])